@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from collections.abc import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from .config import get_settings
 
@@ -14,10 +15,31 @@ class Base(DeclarativeBase):
 
 settings = get_settings()
 connect_args: dict[str, object] = {}
+engine_options: dict[str, object] = {}
 if settings.database_url.startswith('sqlite'):
     connect_args['check_same_thread'] = False
+    if make_url(settings.database_url).database in (None, '', ':memory:'):
+        # An in-memory database only exists on its one connection, so every session must share it.
+        engine_options['poolclass'] = StaticPool
+    else:
+        engine_options.update(pool_size=20, max_overflow=40)
+else:
+    engine_options.update(pool_size=20, max_overflow=40, pool_pre_ping=True, pool_recycle=1800)
+
+engine = create_engine(settings.database_url, connect_args=connect_args, future=True, **engine_options)
+
+if settings.database_url.startswith('sqlite'):
+
+    @event.listens_for(engine, 'connect')
+    def _sqlite_pragmas(dbapi_connection: object, _connection_record: object) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.execute('PRAGMA mmap_size=268435456')
+        cursor.execute('PRAGMA cache_size=-20000')
+        cursor.close()
 
-engine = create_engine(settings.database_url, connect_args=connect_args, future=True)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
 
 
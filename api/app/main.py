@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from typing import Optional, Union
+import csv
+import io
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, Optional, TypeVar, Union
+
+import orjson
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from fastapi import Depends, FastAPI, HTTPException, Query, Response
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import inspect, update
 from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
 
 from .config import get_settings
 from .database import Base, SessionLocal, engine, get_db
@@ -17,6 +25,7 @@ from .schemas import (
     HistoryResponse,
     ItemListResponse,
     ItemOut,
+    RunOut,
     ScheduleResponse,
     ScheduleUpdateRequest,
     ScrapeStatusResponse,
@@ -29,13 +38,12 @@ from .services import (
     build_summary_cards,
     build_topic_trends,
     export_items,
-    export_items_as_csv,
     list_history,
     list_items,
 )
 
 settings = get_settings()
-app = FastAPI(title=settings.app_name, version='1.0.0')
+app = FastAPI(title=settings.app_name, version='1.0.0', default_response_class=ORJSONResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
@@ -48,25 +56,62 @@ scheduler = AsyncIOScheduler(timezone='UTC')
 orchestrator = ScrapeOrchestrator(settings)
 SCHEDULE_JOB_ID = 'scrapepilot_scrape_job'
 
+ANALYTICS_CACHE_TTL_SECONDS = 60.0
 
-@app.on_event('startup')
-async def on_startup() -> None:
+T = TypeVar('T')
+_analytics_cache: dict[str, tuple[int, float, Any]] = {}
+
+
+def _misfire_grace_seconds(interval_minutes: int) -> int:
+    # Half the interval (never under two minutes) so a paused process still catches up on its missed run.
+    return max(120, interval_minutes * 30)
+
+
+def _cached_analytics(key: str, compute: Callable[[], T]) -> T:
+    # Analytics only change when a scrape run finishes, so results are reused until this process's run
+    # version moves; the TTL bounds staleness when another worker is the one that ran the scrape.
+    version = orchestrator.analytics_version
+    now = time.monotonic()
+    cached = _analytics_cache.get(key)
+    if cached is not None and cached[0] == version and now - cached[1] < ANALYTICS_CACHE_TTL_SECONDS:
+        return cached[2]
+    value = compute()
+    _analytics_cache[key] = (version, now, value)
+    return value
+
+
+def _prepare_database() -> None:
     db_path = settings.database_path
     if not db_path.parent.exists():
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    if not set(inspector.get_table_names()).issuperset(Base.metadata.tables):
+        Base.metadata.create_all(bind=engine)
+    else:
+        # create_all only emits indexes alongside new tables; backfill any added since. IF NOT EXISTS keeps
+        # concurrently booting workers from failing when they both see the same index missing.
+        for table in Base.metadata.sorted_tables:
+            existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+            missing_indexes = [index for index in table.indexes if index.name not in existing_indexes]
+            if missing_indexes:
+                with engine.begin() as connection:
+                    for index in missing_indexes:
+                        connection.execute(CreateIndex(index, if_not_exists=True))
+
     with SessionLocal() as db:
-        interrupted_runs = (
-            db.query(ScrapeRun)
-            .filter(ScrapeRun.status == 'running')
-            .all()
+        db.execute(
+            update(ScrapeRun)
+            .where(ScrapeRun.status == 'running')
+            .values(status='failed', error_message='Interrupted before completion')
         )
-        for run in interrupted_runs:
-            run.status = 'failed'
-            run.error_message = 'Interrupted before completion'
         db.commit()
 
+
+@app.on_event('startup')
+async def on_startup() -> None:
+    await run_in_threadpool(_prepare_database)
+
     if not scheduler.running:
         scheduler.add_job(
             orchestrator.run_if_idle,
@@ -76,7 +121,7 @@ async def on_startup() -> None:
             replace_existing=True,
             max_instances=1,
             coalesce=True,
-            misfire_grace_time=120,
+            misfire_grace_time=_misfire_grace_seconds(settings.scrape_interval_minutes),
         )
         scheduler.start()
 
@@ -87,6 +132,7 @@ async def on_startup() -> None:
 async def on_shutdown() -> None:
     if scheduler.running:
         scheduler.shutdown(wait=False)
+    await orchestrator.aclose()
 
 
 @app.get('/health')
@@ -108,7 +154,7 @@ def scrape_status() -> ScrapeStatusResponse:
 
 
 @app.post('/scrape/run')
-async def run_scrape() -> JSONResponse:
+async def run_scrape() -> ORJSONResponse:
     if orchestrator.state.is_running:
         raise HTTPException(status_code=409, detail='Scrape already running')
 
@@ -120,23 +166,23 @@ async def run_scrape() -> JSONResponse:
         'error_message': run.error_message,
         'completed_at': run.completed_at.isoformat() if run.completed_at else None,
     }
-    return JSONResponse(payload)
+    return ORJSONResponse(payload)
 
 
 @app.get('/analytics/summary', response_model=SummaryResponse)
 def analytics_summary(db: Session = Depends(get_db)) -> SummaryResponse:
-    return SummaryResponse(cards=build_summary_cards(db))
+    return SummaryResponse(cards=_cached_analytics('summary', lambda: build_summary_cards(db)))
 
 
 @app.get('/analytics/trending', response_model=TopicSeriesResponse)
 def analytics_trending(db: Session = Depends(get_db)) -> TopicSeriesResponse:
-    topics, points = build_topic_trends(db)
+    topics, points = _cached_analytics('trending', lambda: build_topic_trends(db))
     return TopicSeriesResponse(topics=topics, points=points)
 
 
 @app.get('/analytics/domains')
 def analytics_domains(db: Session = Depends(get_db)) -> list[dict[str, Union[int, str]]]:
-    return build_domains(db)
+    return _cached_analytics('domains', lambda: build_domains(db))
 
 
 @app.get('/items', response_model=ItemListResponse)
@@ -150,43 +196,81 @@ def get_items(
     db: Session = Depends(get_db),
 ) -> ItemListResponse:
     total, items = list_items(db, search, source, sort_by, sort_order, limit, offset)
-    return ItemListResponse(total=total, items=[ItemOut.model_validate(item) for item in items])
+    return ItemListResponse(total=total, items=[ItemOut.model_construct(**item) for item in items])
 
 
 @app.get('/history', response_model=HistoryResponse)
 def history(limit: int = Query(default=30, ge=1, le=200), db: Session = Depends(get_db)) -> HistoryResponse:
     success_rate, runs = list_history(db, limit=limit)
-    return HistoryResponse(success_rate=round(success_rate, 1), runs=runs)
+    return HistoryResponse(success_rate=round(success_rate, 1), runs=[RunOut.model_construct(**run) for run in runs])
 
 
 @app.get('/export/json')
-def export_json(db: Session = Depends(get_db)) -> Response:
-    rows = export_items(db)
-    data = [
-        {
-            'id': row.id,
-            'run_id': row.run_id,
-            'title': row.title,
-            'url': row.url,
-            'points': row.points,
-            'comments': row.comments,
-            'source_domain': row.source_domain,
-            'timestamp': row.timestamp.isoformat(),
-        }
-        for row in rows
-    ]
-    return Response(
-        content=json.dumps(data, indent=2),
-        media_type='application/json',
-        headers={'Content-Disposition': 'attachment; filename=scraped-items.json'},
+def export_json(
+    export_format: str = Query(default='json', alias='format', pattern='^(json|ndjson)$'),
+) -> StreamingResponse:
+    ndjson = export_format == 'ndjson'
+
+    def stream_rows() -> Iterator[bytes]:
+        # Own the session: dependency teardown runs before the body is streamed.
+        with SessionLocal() as db:
+            if not ndjson:
+                yield b'['
+            first = True
+            # One chunk per yield_per batch: every yield costs Starlette a threadpool hop.
+            for partition in export_items(db).partitions():
+                if ndjson:
+                    yield b''.join(orjson.dumps(dict(row), option=orjson.OPT_APPEND_NEWLINE) for row in partition)
+                else:
+                    chunk = b','.join(orjson.dumps(dict(row)) for row in partition)
+                    yield chunk if first else b',' + chunk
+                first = False
+            if not ndjson:
+                yield b']'
+
+    filename = 'scraped-items.ndjson' if ndjson else 'scraped-items.json'
+    return StreamingResponse(
+        stream_rows(),
+        media_type='application/x-ndjson' if ndjson else 'application/json',
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
     )
 
 
 @app.get('/export/csv')
-def export_csv(db: Session = Depends(get_db)) -> StreamingResponse:
-    csv_text = export_items_as_csv(db)
+def export_csv() -> StreamingResponse:
+    def stream_rows() -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        def flush() -> str:
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        writer.writerow(['id', 'run_id', 'title', 'url', 'points', 'comments', 'source_domain', 'timestamp'])
+        yield flush()
+
+        with SessionLocal() as db:
+            # Flush once per yield_per batch: every yield costs Starlette a threadpool hop.
+            for partition in export_items(db).partitions():
+                writer.writerows(
+                    [
+                        row['id'],
+                        row['run_id'],
+                        row['title'],
+                        row['url'],
+                        row['points'],
+                        row['comments'],
+                        row['source_domain'],
+                        row['timestamp'].isoformat(),
+                    ]
+                    for row in partition
+                )
+                yield flush()
+
     return StreamingResponse(
-        iter([csv_text]),
+        stream_rows(),
         media_type='text/csv',
         headers={'Content-Disposition': 'attachment; filename=scraped-items.csv'},
     )
@@ -212,9 +296,10 @@ def update_schedule(payload: ScheduleUpdateRequest) -> ScheduleResponse:
             replace_existing=True,
             max_instances=1,
             coalesce=True,
-            misfire_grace_time=120,
+            misfire_grace_time=_misfire_grace_seconds(payload.interval_minutes),
         )
     else:
+        scheduler.modify_job(SCHEDULE_JOB_ID, misfire_grace_time=_misfire_grace_seconds(payload.interval_minutes))
         scheduler.reschedule_job(SCHEDULE_JOB_ID, trigger='interval', minutes=payload.interval_minutes)
 
     refreshed_job = scheduler.get_job(SCHEDULE_JOB_ID)
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
@@ -17,14 +17,16 @@ class ScrapeRun(Base):
     __tablename__ = 'scrape_runs'
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utcnow, nullable=False, index=True)
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
-    status: Mapped[str] = mapped_column(String(24), nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(24), nullable=False)
     item_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
     items: Mapped[list['ScrapedItem']] = relationship('ScrapedItem', back_populates='run', cascade='all, delete-orphan')
 
+    __table_args__ = (Index('ix_scrape_runs_status_started', 'status', started_at.desc()),)
+
 
 class ScrapedItem(Base):
     __tablename__ = 'scraped_items'
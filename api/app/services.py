@@ -1,14 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-import csv
-import io
 import re
+from collections import Counter
+from collections.abc import Iterator
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Literal, Optional, Union
 
-from sqlalchemy import Select, desc, func, select
+from sqlalchemy import ColumnElement, RowMapping, and_, case, desc, func, insert, null, select
 from sqlalchemy.orm import Session
 
 from scraper.hackernews import HackerNewsScraper
@@ -63,63 +63,92 @@ class ScrapeOrchestrator:
         self._settings = settings
         self._scraper = HackerNewsScraper()
         self._lock = asyncio.Lock()
+        self._analytics_version = 0
         self.state = RuntimeState()
 
+    @property
+    def analytics_version(self) -> int:
+        return self._analytics_version
+
     async def run_once(self) -> ScrapeRun:
         async with self._lock:
             if self.state.is_running:
                 raise RuntimeError('Scrape already running')
             self.state.is_running = True
 
+        # Session work is blocking, so it is pushed to a worker thread to keep the event loop free.
         db = SessionLocal()
         run = ScrapeRun(status='running', started_at=utcnow())
         db.add(run)
-        db.commit()
-        db.refresh(run)
+        # expire_on_commit=False keeps run.id and every field set here loaded, so no refresh is needed.
+        await asyncio.to_thread(db.commit)
 
         try:
             entries = await self._scraper.scrape(
                 pages=self._settings.scraper_pages,
                 delay_ms=self._settings.scraper_request_delay_ms,
             )
-            for entry in entries:
-                db.add(
-                    ScrapedItem(
-                        run_id=run.id,
-                        title=entry.title,
-                        url=entry.url,
-                        points=entry.points,
-                        comments=entry.comments,
-                        source_domain=entry.source_domain,
-                        timestamp=entry.timestamp,
-                    )
+            if entries:
+                await asyncio.to_thread(
+                    db.execute,
+                    insert(ScrapedItem),
+                    [
+                        {
+                            'run_id': run.id,
+                            'title': entry.title,
+                            'url': entry.url,
+                            'points': entry.points,
+                            'comments': entry.comments,
+                            'source_domain': entry.source_domain,
+                            'timestamp': entry.timestamp,
+                        }
+                        for entry in entries
+                    ],
                 )
             run.status = 'success'
             run.item_count = len(entries)
             run.error_message = None
-            self.state.last_error = None
         except Exception as exc:  # pragma: no cover - network failures are expected sometimes
+            if db.in_transaction():
+                # Only a failed insert leaves work to undo; rolling back expires run, so reload it.
+                await asyncio.to_thread(self._rollback_run, db, run)
             run.status = 'failed'
             run.item_count = 0
             run.error_message = str(exc)
-            self.state.last_error = str(exc)
         finally:
             run.completed_at = utcnow()
-            self.state.is_running = False
-            self.state.last_run_status = run.status
-            self.state.last_run_completed_at = run.completed_at
-            db.add(run)
+            # Stay "running" until the outcome is committed, or another run could start in the gap.
+            try:
+                await asyncio.to_thread(self._commit_run, db)
+                self._analytics_version += 1
+                self.state.last_run_status = run.status
+                self.state.last_run_completed_at = run.completed_at
+                self.state.last_error = run.error_message
+            finally:
+                self.state.is_running = False
+
+        return run
+
+    @staticmethod
+    def _commit_run(db: Session) -> None:
+        try:
             db.commit()
-            db.refresh(run)
+        finally:
             db.close()
 
-        return run
+    @staticmethod
+    def _rollback_run(db: Session, run: ScrapeRun) -> None:
+        db.rollback()
+        db.refresh(run)
 
     async def run_if_idle(self) -> Optional[ScrapeRun]:
         if self.state.is_running:
             return None
         return await self.run_once()
 
+    async def aclose(self) -> None:
+        await self._scraper.aclose()
+
 
 def _trend(current: float, previous: float) -> tuple[float, Literal['up', 'down', 'flat']]:
     if previous == 0 and current == 0:
@@ -133,18 +162,46 @@ def _trend(current: float, previous: float) -> tuple[float, Literal['up', 'down'
 
 
 def build_summary_cards(db: Session) -> list[StatCard]:
-    total_items = db.scalar(select(func.count(ScrapedItem.id))) or 0
-    total_runs = db.scalar(select(func.count(ScrapeRun.id))) or 0
-    successful_runs = db.scalar(select(func.count(ScrapeRun.id)).where(ScrapeRun.status == 'success')) or 0
-
-    success_rate = (successful_runs / total_runs * 100) if total_runs else 0.0
-    avg_points = db.scalar(select(func.avg(ScrapedItem.points))) or 0.0
-    avg_comments = db.scalar(select(func.avg(ScrapedItem.comments))) or 0.0
-
-    latest_runs = list(db.scalars(select(ScrapeRun).order_by(desc(ScrapeRun.started_at)).limit(2)).all())
+    latest_runs = db.execute(
+        select(ScrapeRun.id, ScrapeRun.status, ScrapeRun.item_count).order_by(desc(ScrapeRun.started_at)).limit(2)
+    ).all()
     current_run = latest_runs[0] if latest_runs else None
     previous_run = latest_runs[1] if len(latest_runs) > 1 else None
 
+    latest_run_id = current_run.id if current_run else None
+    previous_run_id = previous_run.id if previous_run else None
+
+    def avg_for_run(run_id: Optional[int], column: ColumnElement[int]) -> ColumnElement[Optional[float]]:
+        # Without a run there is nothing to average; NULL falls back to 0.0 below.
+        if run_id is None:
+            return null()
+        return func.avg(case((ScrapedItem.run_id == run_id, column)))
+
+    metrics = db.execute(
+        select(
+            func.count(ScrapedItem.id).label('total_items'),
+            func.avg(ScrapedItem.points).label('avg_points'),
+            func.avg(ScrapedItem.comments).label('avg_comments'),
+            avg_for_run(latest_run_id, ScrapedItem.points).label('current_points'),
+            avg_for_run(previous_run_id, ScrapedItem.points).label('previous_points'),
+            avg_for_run(latest_run_id, ScrapedItem.comments).label('current_comments'),
+            avg_for_run(previous_run_id, ScrapedItem.comments).label('previous_comments'),
+            select(func.count(ScrapeRun.id)).scalar_subquery().label('total_runs'),
+            select(func.count(ScrapeRun.id))
+            .where(ScrapeRun.status == 'success')
+            .scalar_subquery()
+            .label('successful_runs'),
+        ).select_from(ScrapedItem)
+    ).one()
+
+    total_items = metrics.total_items or 0
+    total_runs = metrics.total_runs or 0
+    successful_runs = metrics.successful_runs or 0
+
+    success_rate = (successful_runs / total_runs * 100) if total_runs else 0.0
+    avg_points = float(metrics.avg_points or 0.0)
+    avg_comments = float(metrics.avg_comments or 0.0)
+
     current_items = float(current_run.item_count if current_run else 0)
     previous_items = float(previous_run.item_count if previous_run else 0)
     items_delta, items_dir = _trend(current_items, previous_items)
@@ -153,22 +210,10 @@ def build_summary_cards(db: Session) -> list[StatCard]:
     previous_run_success = 100.0 if previous_run and previous_run.status == 'success' else 0.0
     success_delta, success_dir = _trend(current_run_success, previous_run_success)
 
-    latest_run_id = current_run.id if current_run else None
-    previous_run_id = previous_run.id if previous_run else None
-
-    def avg_for_run(run_id: Optional[int], column: object) -> float:
-        if run_id is None:
-            return 0.0
-        value = db.scalar(select(func.avg(column)).where(ScrapedItem.run_id == run_id))
-        return float(value or 0.0)
-
-    current_points = avg_for_run(latest_run_id, ScrapedItem.points)
-    previous_points = avg_for_run(previous_run_id, ScrapedItem.points)
-    points_delta, points_dir = _trend(current_points, previous_points)
-
-    current_comments = avg_for_run(latest_run_id, ScrapedItem.comments)
-    previous_comments = avg_for_run(previous_run_id, ScrapedItem.comments)
-    comments_delta, comments_dir = _trend(current_comments, previous_comments)
+    points_delta, points_dir = _trend(float(metrics.current_points or 0.0), float(metrics.previous_points or 0.0))
+    comments_delta, comments_dir = _trend(
+        float(metrics.current_comments or 0.0), float(metrics.previous_comments or 0.0)
+    )
 
     cards = [
         StatCard(
@@ -209,41 +254,35 @@ def build_summary_cards(db: Session) -> list[StatCard]:
 
 
 def build_topic_trends(db: Session) -> tuple[list[str], list[dict[str, Union[int, str]]]]:
-    items = list(
-        db.scalars(
-            select(ScrapedItem)
-            .order_by(ScrapedItem.timestamp.asc())
-            .limit(600)
-        ).all()
-    )
+    recent = select(ScrapedItem.title, ScrapedItem.timestamp).order_by(ScrapedItem.timestamp.asc()).limit(600)
+    titles = db.scalars(recent).all()
 
-    if not items:
+    if not titles:
         return [], []
 
-    word_scores: dict[str, int] = {}
-    for item in items:
-        for match in WORD_RE.findall(item.title.lower()):
-            if match in STOP_WORDS:
-                continue
-            word_scores[match] = word_scores.get(match, 0) + 1
+    word_scores = Counter(
+        match for title in titles for match in WORD_RE.findall(title.lower()) if match not in STOP_WORDS
+    )
 
-    topics = [w for w, _ in sorted(word_scores.items(), key=lambda pair: pair[1], reverse=True)[:4]]
+    topics = [w for w, _ in word_scores.most_common(4)]
     if not topics:
         return [], []
 
-    buckets: dict[str, dict[str, int]] = {}
-    for item in items:
-        bucket_key = item.timestamp.astimezone(timezone.utc).strftime('%m-%d %H:%M')
-        bucket = buckets.setdefault(bucket_key, {topic: 0 for topic in topics})
-        title_lower = item.title.lower()
-        for topic in topics:
-            if topic in title_lower:
-                bucket[topic] += 1
+    window = recent.subquery()
+    bucket_key = func.strftime('%m-%d %H:%M', window.c.timestamp)
+    rows = db.execute(
+        select(
+            bucket_key,
+            *(func.sum(case((window.c.title.ilike(f'%{topic}%'), 1), else_=0)) for topic in topics),
+        )
+        .group_by(bucket_key)
+        .order_by(func.min(window.c.timestamp))
+    ).all()
 
     points: list[dict[str, Union[int, str]]] = []
-    for bucket_key, topic_counts in buckets.items():
-        point: dict[str, Union[int, str]] = {'time': bucket_key}
-        point.update(topic_counts)
+    for bucket, *topic_counts in rows:
+        point: dict[str, Union[int, str]] = {'time': bucket}
+        point.update(zip(topics, (int(count) for count in topic_counts)))
         points.append(point)
 
     return topics, points
@@ -268,16 +307,31 @@ def list_items(
     sort_order: str,
     limit: int,
     offset: int,
-) -> tuple[int, list[ScrapedItem]]:
-    base_query: Select[tuple[ScrapedItem]] = select(ScrapedItem)
+) -> tuple[int, list[RowMapping]]:
+    filters: list[ColumnElement[bool]] = []
 
     if search:
-        base_query = base_query.where(ScrapedItem.title.ilike(f'%{search}%'))
+        filters.append(ScrapedItem.title.ilike(f'%{search}%'))
 
     if source:
-        base_query = base_query.where(ScrapedItem.source_domain == source)
+        filters.append(ScrapedItem.source_domain == source)
+
+    count_query = select(func.count(ScrapedItem.id))
+    page_query = select(
+        ScrapedItem.id,
+        ScrapedItem.run_id,
+        ScrapedItem.title,
+        ScrapedItem.url,
+        ScrapedItem.points,
+        ScrapedItem.comments,
+        ScrapedItem.source_domain,
+        ScrapedItem.timestamp,
+    )
+    if filters:
+        count_query = count_query.where(and_(*filters))
+        page_query = page_query.where(and_(*filters))
 
-    total = db.scalar(select(func.count()).select_from(base_query.subquery())) or 0
+    total = db.scalar(count_query) or 0
 
     sort_column = {
         'timestamp': ScrapedItem.timestamp,
@@ -287,16 +341,31 @@ def list_items(
     }.get(sort_by, ScrapedItem.timestamp)
 
     if sort_order == 'asc':
-        base_query = base_query.order_by(sort_column.asc())
+        page_query = page_query.order_by(sort_column.asc())
     else:
-        base_query = base_query.order_by(sort_column.desc())
+        page_query = page_query.order_by(sort_column.desc())
 
-    items = list(db.scalars(base_query.offset(offset).limit(limit)).all())
+    items = list(db.execute(page_query.offset(offset).limit(limit)).mappings().all())
     return total, items
 
 
-def list_history(db: Session, limit: int = 30) -> tuple[float, list[ScrapeRun]]:
-    runs = list(db.scalars(select(ScrapeRun).order_by(desc(ScrapeRun.started_at)).limit(limit)).all())
+def list_history(db: Session, limit: int = 30) -> tuple[float, list[RowMapping]]:
+    runs = list(
+        db.execute(
+            select(
+                ScrapeRun.id,
+                ScrapeRun.started_at,
+                ScrapeRun.completed_at,
+                ScrapeRun.status,
+                ScrapeRun.item_count,
+                ScrapeRun.error_message,
+            )
+            .order_by(desc(ScrapeRun.started_at))
+            .limit(limit)
+        )
+        .mappings()
+        .all()
+    )
 
     total_runs = db.scalar(select(func.count(ScrapeRun.id))) or 0
     successful_runs = db.scalar(select(func.count(ScrapeRun.id)).where(ScrapeRun.status == 'success')) or 0
@@ -305,28 +374,20 @@ def list_history(db: Session, limit: int = 30) -> tuple[float, list[ScrapeRun]]:
     return success_rate, runs
 
 
-def export_items(db: Session) -> list[ScrapedItem]:
-    return list(db.scalars(select(ScrapedItem).order_by(desc(ScrapedItem.timestamp)).limit(1000)).all())
-
-
-def export_items_as_csv(db: Session) -> str:
-    rows = export_items(db)
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['id', 'run_id', 'title', 'url', 'points', 'comments', 'source_domain', 'timestamp'])
-
-    for row in rows:
-        writer.writerow(
-            [
-                row.id,
-                row.run_id,
-                row.title,
-                row.url,
-                row.points,
-                row.comments,
-                row.source_domain,
-                row.timestamp.isoformat(),
-            ]
+def export_items(db: Session) -> Iterator[RowMapping]:
+    stmt = (
+        select(
+            ScrapedItem.id,
+            ScrapedItem.run_id,
+            ScrapedItem.title,
+            ScrapedItem.url,
+            ScrapedItem.points,
+            ScrapedItem.comments,
+            ScrapedItem.source_domain,
+            ScrapedItem.timestamp,
         )
-
-    return output.getvalue()
+        .order_by(desc(ScrapedItem.timestamp))
+        .limit(1000)
+        .execution_options(stream_results=True)
+    )
+    return db.execute(stmt).yield_per(100).mappings()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import re
 from datetime import datetime, timezone
+from typing import Optional
 from urllib.parse import urljoin, urlparse
 
 import httpx
@@ -15,46 +16,72 @@ _DIGITS = re.compile(r'(\d+)')
 
 class HackerNewsScraper:
     base_url = 'https://news.ycombinator.com/'
-
-    async def scrape(self, pages: int = 1, delay_ms: int = 900) -> list[ScrapedEntry]:
-        entries: list[ScrapedEntry] = []
-        current_url = self.base_url
-
-        headers = {
-            'User-Agent': (
-                'ScrapePilot/1.0 (+https://github.com/MickyKee/scrapepilot) '
-                'Portfolio project for public Hacker News data'
+    headers = {
+        'User-Agent': (
+            'ScrapePilot/1.0 (+https://github.com/MickyKee/scrapepilot) '
+            'Portfolio project for public Hacker News data'
+        )
+    }
+
+    def __init__(self) -> None:
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # One pooled client per process keeps the TLS/HTTP2 connection warm between scrapes.
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=15.0,
+                follow_redirects=True,
+                headers=self.headers,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4),
             )
-        }
+        return self._client
 
-        async with httpx.AsyncClient(timeout=15.0, follow_redirects=True, headers=headers) as client:
-            for page in range(max(1, pages)):
-                response = await client.get(current_url)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                entries.extend(self._parse_page(soup, current_url))
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
-                next_link = soup.select_one('a.morelink')
-                if next_link is None:
-                    break
+    async def scrape(self, pages: int = 1, delay_ms: int = 900) -> list[ScrapedEntry]:
+        client = self._get_client()
+        # HN pagination is deterministic, so pages can be requested concurrently instead of following morelink.
+        urls = [self.base_url] + [f'{self.base_url}?p={page}' for page in range(2, max(1, pages) + 1)]
+        semaphore = asyncio.Semaphore(2)
+
+        async def fetch(index: int, url: str) -> str:
+            # Stagger start times so consecutive page requests stay delay_ms apart.
+            await asyncio.sleep(index * max(delay_ms, 0) / 1000)
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+                return response.text
 
-                href = next_link.get('href')
-                if not href:
-                    break
+        # TaskGroup cancels the pending pages as soon as one fails, so an error response stops the crawl.
+        try:
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(fetch(index, url)) for index, url in enumerate(urls)]
+        except ExceptionGroup as errors:
+            raise errors.exceptions[0] from None
 
-                current_url = urljoin(self.base_url, href)
-                if page < pages - 1:
-                    await asyncio.sleep(max(delay_ms, 0) / 1000)
+        entries: list[ScrapedEntry] = []
+        for url, task in zip(urls, tasks):
+            entries.extend(self._parse_page(BeautifulSoup(task.result(), 'lxml'), url))
 
         return entries
 
     def _parse_page(self, soup: BeautifulSoup, page_url: str) -> list[ScrapedEntry]:
         parsed_entries: list[ScrapedEntry] = []
 
-        for story_row in soup.select('tr.athing'):
-            if not isinstance(story_row, Tag):
-                continue
+        # One pass in document order: each story row is followed by its subtext row.
+        story_rows: list[tuple[Tag, Optional[Tag]]] = []
+        for row in soup.select('tr.athing, tr.athing + tr'):
+            if 'athing' in (row.get('class') or []):
+                story_rows.append((row, None))
+            elif story_rows and story_rows[-1][1] is None:
+                story_rows[-1] = (story_rows[-1][0], row)
 
+        for story_row, subtext_row in story_rows:
             link = story_row.select_one('span.titleline > a') or story_row.select_one('a.storylink')
             if not isinstance(link, Tag):
                 continue
@@ -63,13 +90,13 @@ class HackerNewsScraper:
             href = link.get('href', '').strip()
             full_url = urljoin(page_url, href)
 
-            subtext_row = story_row.find_next_sibling('tr')
             points = 0
             comments = 0
 
-            if isinstance(subtext_row, Tag):
+            if subtext_row is not None:
                 points_tag = subtext_row.select_one('span.score')
-                comments_tag = subtext_row.select('a')[-1] if subtext_row.select('a') else None
+                subtext_links = subtext_row.select('a')
+                comments_tag = subtext_links[-1] if subtext_links else None
                 points = self._extract_int(points_tag.get_text(strip=True) if isinstance(points_tag, Tag) else '')
                 comments = self._extract_int(
                     comments_tag.get_text(strip=True) if isinstance(comments_tag, Tag) else ''